@@ -3,15 +3,28 @@ FastAPI Backend for Hydroponic Plant Health Prediction System
 Serves ML predictions via REST API endpoints
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Dict, Any
+from fastapi.responses import ORJSONResponse
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Annotated, List, Dict, Any, Literal, NamedTuple, Optional, Tuple, get_args
+import asyncio
+import threading
+from collections import OrderedDict
+import os
+
+# Single-row predictions are too small to benefit from OpenMP threads; scale
+# out with uvicorn worker processes instead. Must be set before importing xgboost.
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+
 import numpy as np
 import xgboost as xgb
+from numba import njit
 import joblib
-import os
+import sys
 import json
+import orjson
 from pathlib import Path
 from preprocessing import SimpleScaler, SimpleEncoder
 
@@ -19,7 +32,8 @@ from preprocessing import SimpleScaler, SimpleEncoder
 app = FastAPI(
     title="Hydroponic Plant Health Predictor API",
     description="Predicts plant health and growth using XGBoost model",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
 # Enable CORS for frontend communication
@@ -47,33 +61,150 @@ BASE_DIR = Path(__file__).resolve().parent
 MODEL_DIR = BASE_DIR / "models"
 MODEL_DIR.mkdir(exist_ok=True)
 
-MODEL_PATH = MODEL_DIR / "xgb_model.json"
-SCALER_PATH = MODEL_DIR / "scaler.pkl"
+# Native UBJSON model written by train_model.py. Older trainings wrote JSON,
+# which is still loaded when no .ubj model is present.
+MODEL_PATH = MODEL_DIR / "xgb_model.ubj"
+LEGACY_MODEL_PATH = MODEL_DIR / "xgb_model.json"
+# Scaler statistics as .npz; older trainings pickled the SimpleScaler instead
+SCALER_PATH = MODEL_DIR / "scaler.npz"
+LEGACY_SCALER_PATH = MODEL_DIR / "scaler.pkl"
 ENCODER_PATH = MODEL_DIR / "encoder.pkl"
 
-# Global model and preprocessing objects
-model = None
-scaler = None
-encoder = None
+# Inference device: "cpu" (default) or "cuda". CUDA is only used when the
+# installed XGBoost was built with it and CuPy is available for device arrays.
+XGB_DEVICE = os.environ.get("XGB_DEVICE", "cpu")
+
+# Supported visual conditions. The position in this tuple is the integer
+# visual code passed to the jitted helpers; every condition from
+# VISUAL_CODE_FIRST_SYMPTOM on is a stress symptom.
+VisualCondition = Literal["Healthy", "Yellowing", "Wilting", "Leaf Curling", "Spotting"]
+VISUAL_CONDITIONS: Tuple[str, ...] = get_args(VisualCondition)
+VISUAL_CODE_FIRST_SYMPTOM = 2
+_VISUAL_CODE: Dict[str, int] = {name: code for code, name in enumerate(VISUAL_CONDITIONS)}
+
+
+class _ModelState(NamedTuple):
+    """A loaded booster together with everything derived from its preprocessing."""
+    model: xgb.Booster
+    scaler: SimpleScaler
+    encoder: SimpleEncoder
+    # Device the booster predicts on: "cpu" or "cuda"
+    device: str
+    # Encoded feature value for each visual code, precomputed from the encoder
+    visual_encoded: np.ndarray
+    # Scaler statistics as (5,) vectors, applied in place on the batch buffers.
+    # Kept in float64 with a true division so scaled rows are bit-identical to
+    # the training data; the encoded visual column sits exactly on split thresholds.
+    mean: np.ndarray
+    std: np.ndarray
+
+
+# The model being served. Replaced as a whole by a single assignment, so a
+# request always reads one consistent model, scaler and encoder.
+_state: Optional[_ModelState] = None
+
+# LRU cache of serialized /predict bodies keyed on quantized inputs:
+# (pH to 0.01, EC to 1, temperature to 0.1, humidity to 1, visual code)
+PREDICTION_CACHE_SIZE = 4096
+_prediction_cache: "OrderedDict[Tuple[float, float, float, float, int], bytes]" = OrderedDict()
+_cache_hits = 0
+_cache_misses = 0
+
+# Serializes model (re)loads
+_model_lock = threading.Lock()
+
+# CuPy module, imported when predicting on "cuda"
+_cupy = None
+
+
+def _select_device() -> str:
+    """Pick the inference device, falling back to CPU when CUDA is unavailable."""
+    global _cupy
+    if XGB_DEVICE != "cuda":
+        return "cpu"
+    if not xgb.build_info().get("USE_CUDA"):
+        print("⚠ XGBoost was built without CUDA support, predicting on CPU")
+        return "cpu"
+    try:
+        import cupy
+    except ImportError:
+        print("⚠ CuPy is not installed, predicting on CPU")
+        return "cpu"
+    _cupy = cupy
+    return "cuda"
 
 
 def load_model():
     """Load XGBoost model and preprocessing objects from disk."""
-    global model, scaler, encoder
-    try:
-        if MODEL_PATH.exists():
-            model = xgb.Booster(model_file=str(MODEL_PATH))
-            scaler = joblib.load(SCALER_PATH)
-            encoder = joblib.load(ENCODER_PATH)
-            print("✓ Model loaded successfully")
-        else:
-            print("⚠ Model not found. Please run train_model.py first.")
-    except Exception as e:
-        print(f"✗ Error loading model: {e}")
+    with _model_lock:
+        try:
+            model_path = MODEL_PATH if MODEL_PATH.exists() else LEGACY_MODEL_PATH
+            if model_path.exists():
+                new_model = xgb.Booster(model_file=str(model_path))
+                device = _select_device()
+                new_model.set_param({"device": device, "nthread": 1})
+                if SCALER_PATH.exists():
+                    new_scaler = SimpleScaler.load(SCALER_PATH)
+                else:
+                    new_scaler = joblib.load(LEGACY_SCALER_PATH)
+                new_encoder = joblib.load(ENCODER_PATH)
+                state = _build_state(new_model, new_scaler, new_encoder, device)
+                # Warm up before swapping in: a model that cannot predict
+                # never replaces the one being served
+                _warmup(state)
+                _assign_model(state)
+                print(f"✓ Model loaded successfully (device: {device})")
+            else:
+                print("⚠ Model not found. Please run train_model.py first.")
+        except Exception as e:
+            print(f"✗ Error loading model: {e}")
+
+        _build_static_responses()
+
+
+def _build_state(new_model, new_scaler, new_encoder, device: str) -> _ModelState:
+    """Derive the serving state for a freshly loaded model and its preprocessing objects."""
+    return _ModelState(
+        model=new_model,
+        scaler=new_scaler,
+        encoder=new_encoder,
+        device=device,
+        visual_encoded=np.array(
+            [new_encoder.transform([[name]])[0][0] for name in VISUAL_CONDITIONS],
+            dtype=np.float64,
+        ),
+        mean=np.asarray(new_scaler.mean, dtype=np.float64),
+        std=np.asarray(new_scaler.std, dtype=np.float64),
+    )
+
+
+def _assign_model(state: _ModelState):
+    """Start serving a loaded and warmed-up model.
+
+    The whole state is swapped with one assignment, so a failed load keeps
+    serving the previous model instead of a half-updated mix.
+    """
+    global _state
+    _state = state
+    _clear_prediction_cache()
+
 
+def _clear_prediction_cache():
+    """Empty the /predict cache and reset its hit/miss counters."""
+    global _cache_hits, _cache_misses
+    _prediction_cache.clear()
+    _cache_hits = 0
+    _cache_misses = 0
 
-# Load model on startup
-load_model()
+
+def _prediction_cache_info() -> Dict[str, int]:
+    """Return /predict cache statistics, in the style of functools' cache_info()."""
+    return {
+        "hits": _cache_hits,
+        "misses": _cache_misses,
+        "size": len(_prediction_cache),
+        "maxsize": PREDICTION_CACHE_SIZE,
+    }
 
 # ============================================================================
 # PYDANTIC MODELS FOR REQUEST/RESPONSE VALIDATION
@@ -82,11 +213,23 @@ load_model()
 
 class PredictionRequest(BaseModel):
     """Input schema for plant health prediction."""
-    ph_value: float  # 3.0 - 9.0
-    ec_value: float  # EC/TDS in µS/cm or ppm
-    water_temperature: float  # °C
-    air_humidity: float  # % (0-100)
-    visual_condition: str  # One of: Healthy, Yellowing, Wilting, Leaf Curling, Spotting
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+    ph_value: Annotated[float, Field(ge=3.0, le=9.0)]
+    ec_value: Annotated[float, Field(ge=200.0, le=3000.0)]  # EC/TDS in µS/cm or ppm
+    water_temperature: Annotated[float, Field(ge=5.0, le=35.0)]  # °C
+    air_humidity: Annotated[float, Field(ge=20.0, le=95.0)]  # %
+    visual_condition: VisualCondition
+
+
+# Accepted ranges for the numeric /predict fields, checked by _parse_prediction_request
+_REQUEST_RANGES = {
+    "ph_value": (3.0, 9.0),
+    "ec_value": (200.0, 3000.0),
+    "water_temperature": (5.0, 35.0),
+    "air_humidity": (20.0, 95.0),
+}
+_REQUEST_FIELDS = frozenset(PredictionRequest.model_fields)
 
 
 class DiseaseRiskDict(BaseModel):
@@ -109,138 +252,154 @@ class PredictionResponse(BaseModel):
     model_version: str
 
 
+class ScoreResponse(BaseModel):
+    """Output schema for score-only plant health prediction."""
+    health_score: float  # 0-1 score
+    growth_score: float  # 0-1 score
+    yield_score: float  # 0-1 score
+    plant_health_status: str  # Healthy, Stressed, Diseased
+    growth_rate: str  # Low, Moderate, High
+    confidence_score: float  # 0-1
+    model_version: str
+
+
 # ============================================================================
 # UTILITY FUNCTIONS FOR PREDICTIONS
 # ============================================================================
 
 
-def get_health_status(health_score: float) -> str:
-    """Classify health status based on prediction score."""
-    if health_score >= 0.66:
-        return "Healthy"
-    elif health_score >= 0.33:
-        return "Stressed"
-    else:
-        return "Diseased"
+# Status labels indexed by _score_level
+_HEALTH_STATUS_LABELS = ("Diseased", "Stressed", "Healthy")
+_GROWTH_RATE_LABELS = ("Low", "Moderate", "High")
+
+# _score_level thresholds, for decoding whole score columns with np.searchsorted
+_SCORE_LEVEL_BOUNDS = np.array([0.33, 0.66])
 
 
-def get_growth_rate(growth_score: float) -> str:
-    """Classify growth rate based on prediction score."""
-    if growth_score >= 0.66:
-        return "High"
-    elif growth_score >= 0.33:
-        return "Moderate"
+@njit(cache=True)
+def _score_level(score: float) -> int:
+    """Bucket a 0-1 score: 0 = below 0.33, 1 = below 0.66, 2 = 0.66 and above."""
+    if score >= 0.66:
+        return 2
+    elif score >= 0.33:
+        return 1
     else:
-        return "Low"
+        return 0
+
+
+# Nutrient recommendation messages
+_MSG_PH_LOW_TOXICITY = "⚠ Iron/Manganese/Zinc toxicity - pH too low, reduce acidity"
+_MSG_PH_LOW_DEFICIENCY = "📉 Phosphorus/Calcium may be deficient - adjust pH upward"
+_MSG_NPK_DEFICIENCY = "💧 NPK deficiency possible - increase EC/nutrient concentration"
+_MSG_PH_HIGH_DEFICIENCY = "⚠ Iron/Zinc/Manganese deficiency - high pH reduces availability, lower pH"
+_MSG_PH_HIGH_TOXICITY = "⚠ Calcium/Magnesium toxicity risk - monitor closely"
+_MSG_EC_HIGH = "🧂 High EC detected - salt/nutrient accumulation risk, reduce concentration"
+_MSG_EC_VERY_LOW = "💧 Very low EC - insufficient nutrients, increase solution strength"
+_MSG_SEVERE_STRESS = "🚨 Plant severely stressed - review all parameters immediately"
+_MSG_MODERATE_STRESS = "⚠ Plant moderately stressed - optimize growing conditions"
+_NUTRIENTS_OPTIMAL = ("✓ All nutrient levels appear optimal",)
+
+# Visual condition nutrient messages, indexed by visual code (none for Healthy)
+_VISUAL_NUTRIENT_MESSAGES = (
+    None,
+    "🟡 Nitrogen deficiency detected - increase N fertilizer",
+    "🌊 Potassium deficiency or water stress - increase K, check watering",
+    "🍃 Calcium/Boron deficiency - supplement calcium",
+    "⚫ Magnesium/Sulfur deficiency - add Epsom salt or magnesium supplement",
+)
 
 
 def generate_nutrient_recommendations(
-    ph: float, ec: float, health_score: float, visual_condition: str
-) -> List[str]:
+    ph: float, ec: float, health_score: float, visual_code: int
+) -> Tuple[str, ...]:
     """Generate nutrient deficiency/toxicity recommendations based on parameters."""
     recommendations = []
 
     # pH-based nutrient availability analysis
     if ph < 4.5:
-        recommendations.append("⚠ Iron/Manganese/Zinc toxicity - pH too low, reduce acidity")
-        recommendations.append("📉 Phosphorus/Calcium may be deficient - adjust pH upward")
+        recommendations.append(_MSG_PH_LOW_TOXICITY)
+        recommendations.append(_MSG_PH_LOW_DEFICIENCY)
     elif 5.5 <= ph <= 6.5:  # Optimal range
         if ec < 800:
-            recommendations.append("💧 NPK deficiency possible - increase EC/nutrient concentration")
+            recommendations.append(_MSG_NPK_DEFICIENCY)
     elif ph > 7.5:
-        recommendations.append("⚠ Iron/Zinc/Manganese deficiency - high pH reduces availability, lower pH")
-        recommendations.append("⚠ Calcium/Magnesium toxicity risk - monitor closely")
+        recommendations.append(_MSG_PH_HIGH_DEFICIENCY)
+        recommendations.append(_MSG_PH_HIGH_TOXICITY)
 
     # EC-based nutrient analysis
     if ec > 2000:
-        recommendations.append("🧂 High EC detected - salt/nutrient accumulation risk, reduce concentration")
+        recommendations.append(_MSG_EC_HIGH)
     elif ec < 500:
-        recommendations.append("💧 Very low EC - insufficient nutrients, increase solution strength")
+        recommendations.append(_MSG_EC_VERY_LOW)
 
     # Visual condition-based analysis
-    visual_issues = {
-        "Yellowing": "🟡 Nitrogen deficiency detected - increase N fertilizer",
-        "Wilting": "🌊 Potassium deficiency or water stress - increase K, check watering",
-        "Leaf Curling": "🍃 Calcium/Boron deficiency - supplement calcium",
-        "Spotting": "⚫ Magnesium/Sulfur deficiency - add Epsom salt or magnesium supplement",
-    }
-
-    if visual_condition in visual_issues:
-        recommendations.append(visual_issues[visual_condition])
+    visual_issue = _VISUAL_NUTRIENT_MESSAGES[visual_code]
+    if visual_issue is not None:
+        recommendations.append(visual_issue)
 
     # Health-based recommendations
     if health_score < 0.33:
-        recommendations.append("🚨 Plant severely stressed - review all parameters immediately")
+        recommendations.append(_MSG_SEVERE_STRESS)
     elif health_score < 0.66:
-        recommendations.append("⚠ Plant moderately stressed - optimize growing conditions")
+        recommendations.append(_MSG_MODERATE_STRESS)
 
-    return recommendations if recommendations else ["✓ All nutrient levels appear optimal"]
+    return tuple(recommendations) if recommendations else _NUTRIENTS_OPTIMAL
 
 
-def generate_environmental_recommendations(
-    ph: float, ec: float, temperature: float, humidity: float, health_score: float
-) -> List[str]:
-    """Generate environmental adjustment recommendations."""
-    recommendations = []
+# Environmental (lower, upper) bounds per parameter; the range is inclusive.
+_ENV_PH_BOUNDS = (5.5, 7.0)
+_ENV_EC_BOUNDS = (800.0, 1800.0)
+_ENV_TEMPERATURE_BOUNDS = (15.0, 28.0)
+_ENV_HUMIDITY_BOUNDS = (40.0, 80.0)
 
-    # pH adjustments
-    if ph < 5.5:
-        recommendations.append(
-            f"🔴 pH is too low ({ph:.1f}). Increase pH to 5.5-6.5 range by adding potassium hydroxide or using pH+."
-        )
-    elif ph > 7.0:
-        recommendations.append(
-            f"🔴 pH is too high ({ph:.1f}). Reduce pH to 5.5-6.5 range by adding phosphoric acid or pH-."
-        )
-    else:
-        recommendations.append(f"✓ pH ({ph:.1f}) is in optimal range.")
+# %-format message templates per parameter, indexed by (too low, in range, too high)
+_ENV_PH_MESSAGES = (
+    "🔴 pH is too low (%.1f). Increase pH to 5.5-6.5 range by adding potassium hydroxide or using pH+.",
+    "✓ pH (%.1f) is in optimal range.",
+    "🔴 pH is too high (%.1f). Reduce pH to 5.5-6.5 range by adding phosphoric acid or pH-.",
+)
+_ENV_EC_MESSAGES = (
+    "⚠ EC is low (%.0f µS/cm). Increase nutrient solution concentration.",
+    "✓ EC (%.0f µS/cm) is in good range.",
+    "⚠ EC is high (%.0f µS/cm). Dilute solution with fresh water to prevent salt stress.",
+)
+_ENV_TEMPERATURE_MESSAGES = (
+    "❄ Water temperature is low (%.1f°C). Use heater to maintain 18-24°C.",
+    "✓ Temperature (%.1f°C) is optimal.",
+    "🔥 Water temperature is high (%.1f°C). Use chiller or add ice to maintain 18-24°C.",
+)
+_ENV_HUMIDITY_MESSAGES = (
+    "💨 Air humidity is low (%.0f%%). Increase humidity by misting or using humidifiers.",
+    "✓ Humidity (%.0f%%) is acceptable.",
+    "💧 Air humidity is high (%.0f%%). Improve ventilation to reduce fungal disease risk.",
+)
 
-    # EC adjustments
-    if ec < 800:
-        recommendations.append(
-            f"⚠ EC is low ({ec:.0f} µS/cm). Increase nutrient solution concentration."
-        )
-    elif ec > 1800:
-        recommendations.append(
-            f"⚠ EC is high ({ec:.0f} µS/cm). Dilute solution with fresh water to prevent salt stress."
-        )
-    else:
-        recommendations.append(f"✓ EC ({ec:.0f} µS/cm) is in good range.")
 
-    # Temperature adjustments
-    if temperature < 15:
-        recommendations.append(
-            f"❄ Water temperature is low ({temperature:.1f}°C). Use heater to maintain 18-24°C."
-        )
-    elif temperature > 28:
-        recommendations.append(
-            f"🔥 Water temperature is high ({temperature:.1f}°C). Use chiller or add ice to maintain 18-24°C."
-        )
-    else:
-        recommendations.append(f"✓ Temperature ({temperature:.1f}°C) is optimal.")
+def _env_slot(value: float, bounds: Tuple[float, float]) -> int:
+    """Return the message slot for value: 0 = too low, 1 = in range, 2 = too high."""
+    return (value >= bounds[0]) + (value > bounds[1])
 
-    # Humidity adjustments
-    if humidity < 40:
-        recommendations.append(
-            f"💨 Air humidity is low ({humidity:.0f}%). Increase humidity by misting or using humidifiers."
-        )
-    elif humidity > 80:
-        recommendations.append(
-            f"💧 Air humidity is high ({humidity:.0f}%). Improve ventilation to reduce fungal disease risk."
-        )
-    else:
-        recommendations.append(f"✓ Humidity ({humidity:.0f}%) is acceptable.")
 
-    return recommendations
+def generate_environmental_recommendations(
+    ph: float, ec: float, temperature: float, humidity: float, health_score: float
+) -> Tuple[str, ...]:
+    """Generate environmental adjustment recommendations."""
+    return (
+        _ENV_PH_MESSAGES[_env_slot(ph, _ENV_PH_BOUNDS)] % ph,
+        _ENV_EC_MESSAGES[_env_slot(ec, _ENV_EC_BOUNDS)] % ec,
+        _ENV_TEMPERATURE_MESSAGES[_env_slot(temperature, _ENV_TEMPERATURE_BOUNDS)] % temperature,
+        _ENV_HUMIDITY_MESSAGES[_env_slot(humidity, _ENV_HUMIDITY_BOUNDS)] % humidity,
+    )
 
 
-def calculate_disease_risk(
+@njit(cache=True)
+def _disease_risk(
     ph: float,
     ec: float,
     temperature: float,
     humidity: float,
     health_score: float,
-    visual_condition: str,
+    visual_code: int,
 ) -> float:
     """Calculate disease/pest risk percentage based on environmental factors."""
     risk = 0.0
@@ -267,8 +426,8 @@ def calculate_disease_risk(
     if ph < 5.0 or ph > 7.5:
         risk += 15
 
-    # Visual condition indicators
-    if visual_condition in ["Wilting", "Spotting", "Leaf Curling"]:
+    # Visual condition indicators (Wilting, Leaf Curling, Spotting)
+    if visual_code >= VISUAL_CODE_FIRST_SYMPTOM:
         risk += 20
 
     # Reduce risk for healthy plants
@@ -276,164 +435,478 @@ def calculate_disease_risk(
         risk -= 15
 
     # Cap risk between 0 and 100
-    return max(0, min(100, risk))
+    return max(0.0, min(100.0, risk))
 
 
-def calculate_confidence(
+@njit(cache=True)
+def _confidence(
     ph: float,
     ec: float,
     temperature: float,
     humidity: float,
 ) -> float:
-    """Calculate prediction confidence based on input parameter ranges."""
+    """Calculate prediction confidence based on input parameter ranges.
+
+    Inputs outside the supported ranges are rejected during request
+    validation, so only the narrower optimal ranges are penalized here.
+    """
     confidence = 1.0
 
-    # Penalize out-of-range inputs
-    if not (3.0 <= ph <= 9.0):
-        confidence -= 0.3
-    elif not (5.0 <= ph <= 7.5):
+    # Penalize inputs outside the optimal ranges
+    if not (5.0 <= ph <= 7.5):
         confidence -= 0.1
 
-    if not (200 <= ec <= 3000):
-        confidence -= 0.3
-    elif not (800 <= ec <= 2000):
+    if not (800 <= ec <= 2000):
         confidence -= 0.1
 
-    if not (5 <= temperature <= 35):
-        confidence -= 0.3
-    elif not (15 <= temperature <= 28):
+    if not (15 <= temperature <= 28):
         confidence -= 0.1
 
-    if not (20 <= humidity <= 95):
-        confidence -= 0.3
-    elif not (40 <= humidity <= 80):
+    if not (40 <= humidity <= 80):
         confidence -= 0.1
 
     return max(0.3, min(1.0, confidence))
 
 
+@njit(cache=True)
+def _postprocess(
+    health_score: float,
+    growth_score: float,
+    ph: float,
+    ec: float,
+    temperature: float,
+    humidity: float,
+    visual_code: int,
+) -> Tuple[int, int, float, float]:
+    """Compute the numeric per-request outputs in one compiled call.
+
+    Returns (health level, growth level, disease risk, confidence); the levels
+    index _HEALTH_STATUS_LABELS and _GROWTH_RATE_LABELS.
+    """
+    return (
+        _score_level(health_score),
+        _score_level(growth_score),
+        _disease_risk(ph, ec, temperature, humidity, health_score, visual_code),
+        _confidence(ph, ec, temperature, humidity),
+    )
+
+
+@njit(cache=True)
+def _risk_and_confidence_rows(
+    features: np.ndarray, health_scores: np.ndarray, visual_codes: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Disease risk and confidence for each row of raw [pH, EC, Temp, Humidity] features."""
+    n = features.shape[0]
+    risk = np.empty(n)
+    confidence = np.empty(n)
+    for i in range(n):
+        ph, ec, temperature, humidity = features[i, 0], features[i, 1], features[i, 2], features[i, 3]
+        risk[i] = _disease_risk(ph, ec, temperature, humidity, health_scores[i], visual_codes[i])
+        confidence[i] = _confidence(ph, ec, temperature, humidity)
+    return risk, confidence
+
+
+# Disease risk breakdown entries and the offset subtracted from the overall
+# risk when each entry's trigger condition holds
+_DISEASE_NAMES = ("Root Rot", "Powdery Mildew", "Nutrient Burn", "pH Toxicity")
+_RISK_OFFSETS = np.array([20, 30, 25, 15], dtype=np.float64)
+
+
+def disease_risk_breakdown(
+    ph: float, ec: float, temperature: float, humidity: float, disease_risk: float
+) -> Dict[str, float]:
+    """Split the overall disease risk into per-disease probabilities."""
+    triggered = np.array(
+        [
+            humidity > 75,  # Root Rot
+            20 < temperature < 27,  # Powdery Mildew
+            ec > 2000,  # Nutrient Burn
+            ph < 5 or ph > 7.5,  # pH Toxicity
+        ]
+    )
+    high = np.clip(disease_risk - _RISK_OFFSETS, 0, 100) / 100
+    values = np.where(triggered, high, disease_risk / 300)
+    return dict(zip(_DISEASE_NAMES, values.tolist()))
+
+
 # ============================================================================
-# API ENDPOINTS
+# BATCHED INFERENCE
 # ============================================================================
 
+# Concurrent /predict rows are coalesced into a single booster call. Rows that
+# arrive while a batch is running queue up for the next one, so the wait window
+# only needs to be long enough to catch near-simultaneous requests.
+MAX_BATCH = 32
+MAX_WAIT_MS = 2
 
-@app.get("/health")
-def health_check():
-    """Health check endpoint."""
-    return {
-        "status": "ok",
-        "model_loaded": model is not None,
-        "version": "1.0.0",
-    }
+# (MAX_BATCH, 5) feature buffers shared by all batches: raw rows (with the
+# visual code in the last column) are encoded and scaled in place in float64,
+# then cast into the float32 buffer handed to the booster
+_batch_raw = np.empty((MAX_BATCH, 5), dtype=np.float64, order="C")
+_batch_buf = np.empty((MAX_BATCH, 5), dtype=np.float32, order="C")
+_batch_queue: Optional[asyncio.Queue] = None
+_batch_task: Optional[asyncio.Task] = None
 
 
-@app.post("/predict", response_model=PredictionResponse)
-def predict(request: PredictionRequest):
+def _predict_features(state: _ModelState, raw: np.ndarray, batch: np.ndarray) -> np.ndarray:
+    """Encode and scale raw feature rows in place, copy them into the float32 batch
+    and run the booster of state.
+
+    The last column of raw holds the visual code. CPU-bound; run in a worker thread.
     """
-    Predict plant health and provide recommendations.
+    raw[:, 4] = state.visual_encoded[raw[:, 4].astype(np.intp)]
+    np.subtract(raw, state.mean, out=raw)
+    np.divide(raw, state.std, out=raw)
+    batch[...] = raw
+
+    # inplace_predict reads float32 C-contiguous arrays directly, no DMatrix needed
+    if state.device == "cuda":
+        # One host-to-device copy per batch; the booster then runs on the GPU
+        predictions = state.model.inplace_predict(_cupy.asarray(batch), validate_features=False)
+        return _cupy.asnumpy(predictions)
+    return state.model.inplace_predict(batch, validate_features=False)
+
+
+def _infer_batch(n: int) -> np.ndarray:
+    """Run the served booster on the first n rows of the shared batch buffers."""
+    return _predict_features(_state, _batch_raw[:n], _batch_buf[:n])
+
+
+async def _batch_worker():
+    """Collect queued rows into batches and resolve each request's future."""
+    loop = asyncio.get_running_loop()
+    while True:
+        items = [await _batch_queue.get()]
+        deadline = loop.time() + MAX_WAIT_MS / 1000
+        while len(items) < MAX_BATCH:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                items.append(await asyncio.wait_for(_batch_queue.get(), timeout=timeout))
+            except asyncio.TimeoutError:
+                break
+
+        # Feature order: [pH, EC, Temp, Humidity, visual code], written one column at a time
+        n = len(items)
+        for j, column in enumerate(zip(*(row for row, _ in items))):
+            _batch_raw[:n, j] = column
+
+        try:
+            predictions = await run_in_threadpool(_infer_batch, n)
+        except Exception as e:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            continue
+
+        for i, (_, future) in enumerate(items):
+            if not future.done():
+                future.set_result(predictions[i])
+
+
+async def _predict_row(row: Tuple[float, float, float, float, int]) -> np.ndarray:
+    """Queue one raw input row for the batch worker and wait for its predictions."""
+    future = asyncio.get_running_loop().create_future()
+    await _batch_queue.put((row, future))
+    return await future
+
+
+@app.on_event("startup")
+async def start_batch_worker():
+    """Start the background task that serves batched predictions."""
+    global _batch_queue, _batch_task
+    _batch_queue = asyncio.Queue()
+    _batch_task = asyncio.create_task(_batch_worker())
+
+
+@app.on_event("shutdown")
+async def stop_batch_worker():
+    """Stop the batch worker task."""
+    if _batch_task is not None:
+        _batch_task.cancel()
+
+
+# Maximum number of rows accepted by /predict-batch
+MAX_PREDICT_BATCH = 1000
+
+# OpenAPI request bodies for endpoints that validate PredictionRequest by hand
+_PREDICTION_REQUEST_BODY = {
+    "requestBody": {
+        "content": {"application/json": {"schema": PredictionRequest.model_json_schema()}},
+        "required": True,
+    }
+}
+_PREDICTION_BATCH_BODY = {
+    "requestBody": {
+        "content": {
+            "application/json": {
+                "schema": {
+                    "type": "array",
+                    "items": PredictionRequest.model_json_schema(),
+                    "maxItems": MAX_PREDICT_BATCH,
+                }
+            }
+        },
+        "required": True,
+    }
+}
 
-    Args:
-        request: PredictionRequest with plant parameters
 
-    Returns:
-        PredictionResponse with health predictions and recommendations
+def _load_json(body: bytes) -> Any:
+    """Decode a JSON request body, raising 422 when it is malformed."""
+    try:
+        return orjson.loads(body)
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=422, detail="Request body must be valid JSON")
+
+
+def _parse_prediction_request(body: bytes) -> Tuple[float, float, float, float, int]:
+    """Decode and validate a /predict body without building a PredictionRequest.
+
+    Returns the four numeric inputs followed by the visual code of
+    visual_condition.
     """
-    if model is None or scaler is None or encoder is None:
+    data = _load_json(body)
+    if not isinstance(data, dict):
+        raise HTTPException(status_code=422, detail="Request body must be a JSON object")
+    return _validate_prediction_fields(data)
+
+
+def _parse_prediction_batch(body: bytes) -> List[Tuple[float, float, float, float, int]]:
+    """Decode and validate a /predict-batch body, one row per item."""
+    data = _load_json(body)
+    if not isinstance(data, list):
+        raise HTTPException(status_code=422, detail="Request body must be a JSON array")
+    if len(data) > MAX_PREDICT_BATCH:
         raise HTTPException(
-            status_code=503,
-            detail="Model not loaded. Please train model first using train_model.py",
+            status_code=422,
+            detail=f"At most {MAX_PREDICT_BATCH} predictions per request",
         )
 
+    rows = []
+    for i, item in enumerate(data):
+        if not isinstance(item, dict):
+            raise HTTPException(status_code=422, detail=f"Item {i} must be a JSON object")
+        try:
+            rows.append(_validate_prediction_fields(item))
+        except HTTPException as e:
+            raise HTTPException(status_code=422, detail=f"Item {i}: {e.detail}")
+    return rows
+
+
+def _validate_prediction_fields(data: Dict[str, Any]) -> Tuple[float, float, float, float, int]:
+    """Validate one decoded PredictionRequest object by hand."""
+    unexpected = data.keys() - _REQUEST_FIELDS
+    if unexpected:
+        raise HTTPException(status_code=422, detail=f"Unexpected field: {min(unexpected)}")
+
+    values = []
+    for field, (low, high) in _REQUEST_RANGES.items():
+        try:
+            value = float(data[field])
+        except KeyError:
+            raise HTTPException(status_code=422, detail=f"Missing field: {field}")
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=422, detail=f"{field} must be a number")
+        if not low <= value <= high:
+            raise HTTPException(status_code=422, detail=f"{field} must be between {low} and {high}")
+        values.append(value)
+
     try:
-        # Prepare input features
-        visual_encoded = encoder.transform([[request.visual_condition]])[0][0]
-
-        # Create feature array: [pH, EC, Temp, Humidity, Visual]
-        features = np.array(
-            [
-                [
-                    request.ph_value,
-                    request.ec_value,
-                    request.water_temperature,
-                    request.air_humidity,
-                    visual_encoded,
-                ]
-            ]
+        visual_condition = data["visual_condition"]
+    except KeyError:
+        raise HTTPException(status_code=422, detail="Missing field: visual_condition")
+    if not isinstance(visual_condition, str):
+        raise HTTPException(status_code=422, detail="visual_condition must be a string")
+    visual_code = _VISUAL_CODE.get(visual_condition)
+    if visual_code is None:
+        raise HTTPException(
+            status_code=422,
+            detail=f"visual_condition must be one of: {', '.join(VISUAL_CONDITIONS)}",
         )
 
-        # Scale features
-        features_scaled = scaler.transform(features)
-
-        # Make predictions (model outputs 3 values: health, growth, yield)
-        dmatrix = xgb.DMatrix(features_scaled)
-        predictions = model.predict(dmatrix)[0]
-        health_score = predictions[0]
-        growth_score = predictions[1]
-        yield_score = predictions[2]
-
-        # Generate classifications and recommendations
-        health_status = get_health_status(health_score)
-        growth_rate = get_growth_rate(growth_score)
-        disease_risk = calculate_disease_risk(
-            request.ph_value,
-            request.ec_value,
-            request.water_temperature,
-            request.air_humidity,
-            health_score,
-            request.visual_condition,
-        )
-        nutrient_issues = generate_nutrient_recommendations(
-            request.ph_value,
-            request.ec_value,
-            health_score,
-            request.visual_condition,
-        )
-        environmental_recs = generate_environmental_recommendations(
-            request.ph_value,
-            request.ec_value,
-            request.water_temperature,
-            request.air_humidity,
-            health_score,
-        )
-        confidence = calculate_confidence(
-            request.ph_value,
-            request.ec_value,
-            request.water_temperature,
-            request.air_humidity,
-        )
+    ph, ec, temperature, humidity = values
+    return ph, ec, temperature, humidity, visual_code
 
-        # Build disease risk breakdown
-        disease_risk_dict = {
-            "Root Rot": max(0, min(100, disease_risk - 20)) / 100 if request.air_humidity > 75 else disease_risk / 300,
-            "Powdery Mildew": max(0, min(100, disease_risk - 30)) / 100 if 20 < request.water_temperature < 27 else disease_risk / 300,
-            "Nutrient Burn": max(0, min(100, disease_risk - 25)) / 100 if request.ec_value > 2000 else disease_risk / 300,
-            "pH Toxicity": max(0, min(100, disease_risk - 15)) / 100 if request.ph_value < 5 or request.ph_value > 7.5 else disease_risk / 300,
-        }
 
-        return PredictionResponse(
-            health_score=float(health_score),
-            growth_score=float(growth_score),
-            yield_score=float(yield_score),
-            plant_health_status=health_status,
-            growth_rate=growth_rate,
-            disease_risk=disease_risk_dict,
-            nutrient_recommendations=nutrient_issues,
-            environmental_recommendations=environmental_recs,
-            confidence_score=confidence,
-            model_version="1.0.0",
+def _require_model():
+    """Raise 503 unless the model and preprocessing objects are loaded."""
+    if _state is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Model not loaded. Please train model first using train_model.py",
         )
 
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Prediction error: {str(e)}")
 
+def _quantize_inputs(
+    ph: float, ec: float, temperature: float, humidity: float, visual_code: int
+) -> Tuple[float, float, float, float, int]:
+    """Round inputs to sensor precision (pH 0.01, EC 1, temperature 0.1, humidity 1)."""
+    return (
+        round(ph, 2),
+        float(round(ec)),
+        round(temperature, 1),
+        float(round(humidity)),
+        visual_code,
+    )
+
+
+async def _score_only(
+    ph: float, ec: float, temperature: float, humidity: float, visual_code: int
+) -> Tuple[float, float, float, str, str, float, float]:
+    """Predict the score fields of one input without building recommendations."""
+    # Batched prediction off the event loop (model outputs 3 values: health, growth, yield)
+    predictions = await _predict_row((ph, ec, temperature, humidity, visual_code))
+    return _score_fields(predictions, ph, ec, temperature, humidity, visual_code)
+
+
+def _score_fields(
+    predictions: np.ndarray,
+    ph: float,
+    ec: float,
+    temperature: float,
+    humidity: float,
+    visual_code: int,
+) -> Tuple[float, float, float, str, str, float, float]:
+    """Turn one row of booster outputs into scores, status labels, confidence and disease risk."""
+    health_score = float(predictions[0])
+    growth_score = float(predictions[1])
+    yield_score = float(predictions[2])
+
+    health_level, growth_level, disease_risk, confidence = _postprocess(
+        health_score, growth_score, ph, ec, temperature, humidity, visual_code
+    )
+    return (
+        health_score,
+        growth_score,
+        yield_score,
+        _HEALTH_STATUS_LABELS[health_level],
+        _GROWTH_RATE_LABELS[growth_level],
+        confidence,
+        disease_risk,
+    )
+
+
+def _score_fields_batch(
+    predictions: np.ndarray, inputs: np.ndarray
+) -> List[Tuple[float, float, float, str, str, float, float]]:
+    """Vectorized _score_fields for (N, 3) booster outputs and (N, 5) raw inputs.
+
+    The last input column holds the visual code.
+    """
+    health_scores = predictions[:, 0].astype(np.float64)
+    visual_codes = inputs[:, 4].astype(np.int64)
+
+    # Levels for the health and growth columns at once: 0, 1 or 2 per score
+    levels = np.searchsorted(_SCORE_LEVEL_BOUNDS, predictions[:, :2], side="right")
+    risk, confidence = _risk_and_confidence_rows(inputs, health_scores, visual_codes)
+
+    fields = []
+    for scores, (health_level, growth_level), row_confidence, row_risk in zip(
+        predictions.tolist(), levels.tolist(), confidence.tolist(), risk.tolist()
+    ):
+        health_score, growth_score, yield_score = scores
+        fields.append(
+            (
+                health_score,
+                growth_score,
+                yield_score,
+                _HEALTH_STATUS_LABELS[health_level],
+                _GROWTH_RATE_LABELS[growth_level],
+                row_confidence,
+                row_risk,
+            )
+        )
+    return fields
 
-@app.get("/model-info")
-def model_info():
-    """Get information about the loaded model."""
-    if model is None:
-        return {"status": "not_loaded", "message": "No model loaded"}
 
+def _build_prediction(
+    ph: float,
+    ec: float,
+    temperature: float,
+    humidity: float,
+    visual_code: int,
+    scores: Tuple[float, float, float, str, str, float, float],
+) -> Dict[str, Any]:
+    """Build the full /predict payload from the inputs and their score fields."""
+    (
+        health_score,
+        growth_score,
+        yield_score,
+        health_status,
+        growth_rate,
+        confidence,
+        disease_risk,
+    ) = scores
+
+    # Generate recommendations
+    nutrient_issues = generate_nutrient_recommendations(ph, ec, health_score, visual_code)
+    environmental_recs = generate_environmental_recommendations(
+        ph, ec, temperature, humidity, health_score
+    )
+
+    disease_risk_dict = disease_risk_breakdown(ph, ec, temperature, humidity, disease_risk)
+
+    # Build the payload directly; PredictionResponse only documents the schema
     return {
+        "health_score": health_score,
+        "growth_score": growth_score,
+        "yield_score": yield_score,
+        "plant_health_status": health_status,
+        "growth_rate": growth_rate,
+        "disease_risk": disease_risk_dict,
+        "nutrient_recommendations": nutrient_issues,
+        "environmental_recommendations": environmental_recs,
+        "confidence_score": confidence,
+        "model_version": "1.0.0",
+    }
+
+
+def _warmup(state: _ModelState):
+    """Run one canned row through the prediction path of state so the first request is not slow.
+
+    Raises if the model cannot predict, before it is ever served.
+    """
+    ph, ec, temperature, humidity = 6.0, 1200.0, 21.0, 60.0
+    visual_code = 0
+
+    # Primes the booster's predictor (and the CUDA context when enabled). Uses its
+    # own arrays so a reload never touches the buffers of an in-flight batch.
+    inputs = np.array([[ph, ec, temperature, humidity, visual_code]], dtype=np.float64)
+    predictions = _predict_features(
+        state, inputs.copy(), np.empty(inputs.shape, dtype=np.float32)
+    )
+    health_score = float(predictions[0][0])
+
+    # Compiles, or loads from the cache, the Numba kernels with the request-time types
+    _postprocess(health_score, health_score, ph, ec, temperature, humidity, visual_code)
+    _risk_and_confidence_rows(
+        inputs, np.array([health_score]), np.array([visual_code], dtype=np.int64)
+    )
+
+
+# Prebuilt /health body and static /model-info fields, refreshed on every model load
+_HEALTH_BYTES: bytes
+_MODEL_INFO: Dict[str, Any]
+
+
+def _build_static_responses():
+    """Build the /health and /model-info bodies for the current model state."""
+    global _HEALTH_BYTES, _MODEL_INFO
+    _HEALTH_BYTES = orjson.dumps(
+        {
+            "status": "ok",
+            "model_loaded": _state is not None,
+            "version": "1.0.0",
+        }
+    )
+
+    if _state is None:
+        _MODEL_INFO = {"status": "not_loaded", "message": "No model loaded"}
+        return
+
+    _MODEL_INFO = {
         "status": "loaded",
         "model_type": "XGBRegressor (Multi-output)",
         "version": "1.0.0",
@@ -444,12 +917,198 @@ def model_info():
             "ec_value": "200 - 3000 µS/cm",
             "water_temperature": "5 - 35 °C",
             "air_humidity": "20 - 95 %",
-            "visual_condition": ["Healthy", "Yellowing", "Wilting", "Leaf Curling", "Spotting"],
+            "visual_condition": list(VISUAL_CONDITIONS),
         },
     }
 
 
+# Valid "not loaded" bodies until the startup handler has loaded a model
+_build_static_responses()
+
+
+@app.on_event("startup")
+async def load_model_on_startup():
+    """Load the model when the server starts rather than when main is imported."""
+    load_model()
+
+# ============================================================================
+# API ENDPOINTS
+# ============================================================================
+
+
+@app.get("/health")
+async def health_check():
+    """Health check endpoint."""
+    return Response(content=_HEALTH_BYTES, media_type="application/json")
+
+
+@app.post(
+    "/predict",
+    response_model=PredictionResponse,
+    response_class=ORJSONResponse,
+    openapi_extra=_PREDICTION_REQUEST_BODY,
+)
+async def predict(request: Request):
+    """
+    Predict plant health and provide recommendations.
+
+    Args:
+        request: Raw request whose JSON body follows the PredictionRequest schema
+
+    Returns:
+        PredictionResponse with health predictions and recommendations
+    """
+    global _cache_hits, _cache_misses
+    ph, ec, temperature, humidity, visual_code = _parse_prediction_request(
+        await request.body()
+    )
+
+    _require_model()
+
+    # Predict on the quantized inputs so a cached payload depends only on its key
+    key = _quantize_inputs(ph, ec, temperature, humidity, visual_code)
+    cached = _prediction_cache.get(key)
+    if cached is not None:
+        _cache_hits += 1
+        _prediction_cache.move_to_end(key)
+        return Response(content=cached, media_type="application/json")
+    _cache_misses += 1
+    ph, ec, temperature, humidity, _ = key
+    state = _state
+
+    try:
+        scores = await _score_only(ph, ec, temperature, humidity, visual_code)
+        payload = _build_prediction(ph, ec, temperature, humidity, visual_code, scores)
+
+        body = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+        # A model load while this request awaited its batch has already cleared
+        # the cache; don't refill it with a body the previous model may have scored
+        if _state is state:
+            _prediction_cache[key] = body
+            if len(_prediction_cache) > PREDICTION_CACHE_SIZE:
+                _prediction_cache.popitem(last=False)
+
+        return Response(content=body, media_type="application/json")
+
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Prediction error: {str(e)}")
+
+
+@app.post(
+    "/predict/score",
+    response_model=ScoreResponse,
+    response_class=ORJSONResponse,
+    openapi_extra=_PREDICTION_REQUEST_BODY,
+)
+async def predict_score(request: Request):
+    """
+    Predict plant health scores only, skipping recommendations and disease risk.
+
+    Args:
+        request: Raw request whose JSON body follows the PredictionRequest schema
+
+    Returns:
+        ScoreResponse with health, growth and yield scores
+    """
+    ph, ec, temperature, humidity, visual_code = _parse_prediction_request(
+        await request.body()
+    )
+
+    _require_model()
+
+    # Same quantized inputs as /predict, so both endpoints return the same scores
+    ph, ec, temperature, humidity, visual_code = _quantize_inputs(
+        ph, ec, temperature, humidity, visual_code
+    )
+
+    try:
+        (
+            health_score,
+            growth_score,
+            yield_score,
+            health_status,
+            growth_rate,
+            confidence,
+            _,
+        ) = await _score_only(ph, ec, temperature, humidity, visual_code)
+
+        return ORJSONResponse(
+            content={
+                "health_score": health_score,
+                "growth_score": growth_score,
+                "yield_score": yield_score,
+                "plant_health_status": health_status,
+                "growth_rate": growth_rate,
+                "confidence_score": confidence,
+                "model_version": "1.0.0",
+            }
+        )
+
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Prediction error: {str(e)}")
+
+
+@app.post(
+    "/predict-batch",
+    response_model=List[PredictionResponse],
+    response_class=ORJSONResponse,
+    openapi_extra=_PREDICTION_BATCH_BODY,
+)
+async def predict_batch(request: Request):
+    """
+    Predict plant health for many inputs with a single booster call.
+
+    Args:
+        request: Raw request whose JSON body is an array of PredictionRequest objects
+
+    Returns:
+        List of PredictionResponse objects, in request order
+    """
+    rows = _parse_prediction_batch(await request.body())
+
+    _require_model()
+    if not rows:
+        return ORJSONResponse(content=[])
+
+    try:
+        # Same quantized inputs as /predict, so both endpoints agree row for row
+        rows = [_quantize_inputs(*row) for row in rows]
+        inputs = np.array(rows, dtype=np.float64)
+
+        # _predict_features encodes and scales its rows in place, so it gets a copy
+        batch = np.empty(inputs.shape, dtype=np.float32)
+        predictions = await run_in_threadpool(_predict_features, _state, inputs.copy(), batch)
+
+        payloads = [
+            _build_prediction(*row, scores)
+            for row, scores in zip(rows, _score_fields_batch(predictions, inputs))
+        ]
+
+        return ORJSONResponse(content=payloads)
+
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Prediction error: {str(e)}")
+
+
+@app.get("/model-info")
+async def model_info():
+    """Get information about the loaded model and its prediction cache."""
+    if _state is None:
+        return ORJSONResponse(content=_MODEL_INFO)
+    return ORJSONResponse(content={**_MODEL_INFO, "prediction_cache": _prediction_cache_info()})
+
+
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # uvloop + httptools replace the pure-Python event loop and HTTP parser.
+    # Workers need the app as an import string; uvloop has no Windows build.
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=os.cpu_count(),
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        log_level="warning",
+    )
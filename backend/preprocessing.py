@@ -13,8 +13,10 @@ class SimpleScaler:
         self.std = None
     
     def fit(self, X):
-        self.mean = np.mean(X, axis=0)
-        self.std = np.std(X, axis=0)
+        # Accumulate in float64 whatever the input dtype, so float32 data gets
+        # the same statistics the float64 serving path divides by
+        self.mean = np.mean(X, axis=0, dtype=np.float64)
+        self.std = np.std(X, axis=0, dtype=np.float64)
         self.std[self.std == 0] = 1  # Avoid division by zero
         return self
     
@@ -24,6 +26,19 @@ class SimpleScaler:
     def fit_transform(self, X):
         return self.fit(X).transform(X)
 
+    def save(self, path):
+        """Save mean and std to an .npz file; cheaper to load than a pickle."""
+        np.savez(path, mean=self.mean, std=self.std)
+
+    @classmethod
+    def load(cls, path):
+        """Load a scaler written by save()."""
+        scaler = cls()
+        with np.load(path) as data:
+            scaler.mean = data["mean"]
+            scaler.std = data["std"]
+        return scaler
+
 
 class SimpleEncoder:
     """Simple LabelEncoder replacement without sklearn"""
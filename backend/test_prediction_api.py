@@ -0,0 +1,215 @@
+"""
+Behavior tests for the prediction endpoints: request validation, the
+/predict-batch size limit, the /predict cache and agreement between
+/predict, /predict/score and /predict-batch.
+
+Trains a small model into a temporary directory once per session.
+Run from backend/ with: python -m pytest -q (needs pytest and httpx)
+"""
+
+import random
+
+import joblib
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import train_model
+
+VALID_BODY = {
+    "ph_value": 6.0,
+    "ec_value": 1200,
+    "water_temperature": 21,
+    "air_humidity": 60,
+    "visual_condition": "Healthy",
+}
+
+
+@pytest.fixture(scope="session")
+def client(tmp_path_factory):
+    """A TestClient running the app against a freshly trained model."""
+    model_dir = tmp_path_factory.mktemp("models")
+    df = train_model.generate_synthetic_data(train_model.SYNTHETIC_SAMPLES)
+    X_train, X_test, y_train, y_test, scaler, encoder = train_model.preprocess_data(df)
+    model = train_model.train_model(X_train, X_test, y_train, y_test)
+    model.save_model(str(model_dir / "xgb_model.ubj"))
+    scaler.save(model_dir / "scaler.npz")
+    joblib.dump(encoder, model_dir / "encoder.pkl")
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(main, "MODEL_PATH", model_dir / "xgb_model.ubj")
+        mp.setattr(main, "SCALER_PATH", model_dir / "scaler.npz")
+        mp.setattr(main, "ENCODER_PATH", model_dir / "encoder.pkl")
+        # Entering the client runs the startup handlers: model load and batch worker
+        with TestClient(main.app) as test_client:
+            yield test_client
+
+
+def random_bodies(n, seed=0):
+    """Random valid request bodies with unrounded sensor readings."""
+    rnd = random.Random(seed)
+    return [
+        {
+            "ph_value": rnd.uniform(3, 9),
+            "ec_value": rnd.uniform(200, 3000),
+            "water_temperature": rnd.uniform(5, 35),
+            "air_humidity": rnd.uniform(20, 95),
+            "visual_condition": rnd.choice(main.VISUAL_CONDITIONS),
+        }
+        for _ in range(n)
+    ]
+
+
+# ============================================================================
+# REQUEST VALIDATION
+# ============================================================================
+
+
+@pytest.mark.parametrize("path", ["/predict", "/predict/score"])
+@pytest.mark.parametrize(
+    "field, value",
+    [
+        ("ph_value", 2.9),
+        ("ec_value", 3000.5),
+        ("water_temperature", 4.0),
+        ("air_humidity", 96),
+    ],
+)
+def test_out_of_range_field_is_rejected(client, path, field, value):
+    response = client.post(path, json={**VALID_BODY, field: value})
+    assert response.status_code == 422
+    low, high = main._REQUEST_RANGES[field]
+    assert response.json()["detail"] == f"{field} must be between {low} and {high}"
+
+
+@pytest.mark.parametrize("path", ["/predict", "/predict/score"])
+def test_extra_field_is_rejected(client, path):
+    response = client.post(path, json={**VALID_BODY, "plant": "basil"})
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Unexpected field: plant"
+
+
+@pytest.mark.parametrize("path", ["/predict", "/predict/score"])
+@pytest.mark.parametrize("field", list(VALID_BODY))
+def test_missing_field_is_rejected(client, path, field):
+    body = {key: value for key, value in VALID_BODY.items() if key != field}
+    response = client.post(path, json=body)
+    assert response.status_code == 422
+    assert response.json()["detail"] == f"Missing field: {field}"
+
+
+def test_non_numeric_field_is_rejected(client):
+    response = client.post("/predict", json={**VALID_BODY, "ph_value": "six"})
+    assert response.status_code == 422
+    assert response.json()["detail"] == "ph_value must be a number"
+
+
+def test_unknown_visual_condition_is_rejected(client):
+    response = client.post("/predict", json={**VALID_BODY, "visual_condition": "Purple"})
+    assert response.status_code == 422
+    assert response.json()["detail"].startswith("visual_condition must be one of:")
+
+
+def test_batch_item_errors_name_the_item(client):
+    response = client.post("/predict-batch", json=[VALID_BODY, {**VALID_BODY, "ph_value": 10}])
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Item 1: ph_value must be between 3.0 and 9.0"
+
+
+# ============================================================================
+# BATCH SIZE LIMIT
+# ============================================================================
+
+
+def test_batch_at_size_limit_is_accepted(client):
+    response = client.post("/predict-batch", json=[VALID_BODY] * main.MAX_PREDICT_BATCH)
+    assert response.status_code == 200
+    assert len(response.json()) == main.MAX_PREDICT_BATCH
+
+
+def test_batch_over_size_limit_is_rejected(client):
+    response = client.post("/predict-batch", json=[VALID_BODY] * (main.MAX_PREDICT_BATCH + 1))
+    assert response.status_code == 422
+    assert response.json()["detail"] == f"At most {main.MAX_PREDICT_BATCH} predictions per request"
+
+
+def test_empty_batch_returns_empty_list(client):
+    response = client.post("/predict-batch", json=[])
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+# ============================================================================
+# PREDICTION CACHE
+# ============================================================================
+
+
+def cache_info(client):
+    return client.get("/model-info").json()["prediction_cache"]
+
+
+def test_repeated_reading_is_a_cache_hit(client):
+    body = {**VALID_BODY, "ph_value": 6.123, "air_humidity": 61.2}
+    before = cache_info(client)
+
+    first = client.post("/predict", json=body)
+    after_first = cache_info(client)
+    assert after_first["misses"] == before["misses"] + 1
+    assert after_first["hits"] == before["hits"]
+
+    # Rounds to the same key (pH to 0.01, humidity to 1), so it is served from the cache
+    second = client.post("/predict", json={**body, "ph_value": 6.1204, "air_humidity": 60.9})
+    after_second = cache_info(client)
+    assert after_second["hits"] == after_first["hits"] + 1
+    assert after_second["misses"] == after_first["misses"]
+    assert second.content == first.content
+
+
+def test_cache_is_cleared_on_model_load(client):
+    client.post("/predict", json=VALID_BODY)
+    main.load_model()
+    assert cache_info(client) == {
+        "hits": 0,
+        "misses": 0,
+        "size": 0,
+        "maxsize": main.PREDICTION_CACHE_SIZE,
+    }
+
+
+def test_reload_during_request_does_not_cache_stale_body(client, monkeypatch):
+    score_only = main._score_only
+
+    async def score_then_reload(*args):
+        scores = await score_only(*args)
+        # Another model is loaded while the request is still in flight
+        main.load_model()
+        return scores
+
+    monkeypatch.setattr(main, "_score_only", score_then_reload)
+    response = client.post("/predict", json={**VALID_BODY, "ph_value": 5.87})
+    assert response.status_code == 200
+    assert cache_info(client)["size"] == 0
+
+
+# ============================================================================
+# ENDPOINT CONSISTENCY
+# ============================================================================
+
+
+def test_score_predict_and_batch_agree(client):
+    bodies = random_bodies(50)
+    batch = client.post("/predict-batch", json=bodies).json()
+    score_keys = [
+        "health_score",
+        "growth_score",
+        "yield_score",
+        "plant_health_status",
+        "growth_rate",
+        "confidence_score",
+    ]
+
+    for body, batch_result in zip(bodies, batch):
+        full = client.post("/predict", json=body).json()
+        score = client.post("/predict/score", json=body).json()
+        assert full == batch_result
+        assert {key: full[key] for key in score_keys} == {key: score[key] for key in score_keys}